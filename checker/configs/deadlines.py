@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import sys
+from collections import Counter
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Optional, Union
@@ -16,6 +17,11 @@ from pydantic import AnyUrl, Field, field_validator, model_validator
 from .utils import CustomBaseModel, YamlLoaderMixin
 
 
+def _find_duplicates(names: list[str]) -> list[str]:
+    counts = Counter(names)
+    return [name for name in names if counts[name] > 1]
+
+
 class DeadlinesType(Enum):
     HARD = "hard"
     INTERPOLATE = "interpolate"
@@ -71,6 +77,12 @@ class DeadlinesTaskConfig(CustomBaseModel):
     def name(self) -> str:
         return self.task
 
+    @field_validator("task")
+    @classmethod
+    def intern_task_name(cls, data: str) -> str:
+        # names are dict keys for every course lookup, interned strings compare by identity
+        return sys.intern(data)
+
 
 class DeadlinesGroupConfig(CustomBaseModel):
     group: str
@@ -88,6 +100,11 @@ class DeadlinesGroupConfig(CustomBaseModel):
     def name(self) -> str:
         return self.group
 
+    @field_validator("group")
+    @classmethod
+    def intern_group_name(cls, data: str) -> str:
+        return sys.intern(data)
+
     @model_validator(mode="after")
     def check_dates(self) -> "DeadlinesGroupConfig":
         # check end
@@ -183,8 +200,7 @@ class DeadlinesConfig(CustomBaseModel, YamlLoaderMixin["DeadlinesConfig"]):
     @field_validator("schedule")
     @classmethod
     def check_group_names_unique(cls, data: list[DeadlinesGroupConfig]) -> list[DeadlinesGroupConfig]:
-        groups = [group.name for group in data]
-        duplicates = [name for name in groups if groups.count(name) > 1]
+        duplicates = _find_duplicates([group.name for group in data])
         if duplicates:
             raise ValueError(f"Group names should be unique, duplicates: {duplicates}")
         return data
@@ -192,8 +208,7 @@ class DeadlinesConfig(CustomBaseModel, YamlLoaderMixin["DeadlinesConfig"]):
     @field_validator("schedule")
     @classmethod
     def check_task_names_unique(cls, data: list[DeadlinesGroupConfig]) -> list[DeadlinesGroupConfig]:
-        tasks_names = [task.name for group in data for task in group.tasks]
-        duplicates = [name for name in tasks_names if tasks_names.count(name) > 1]
+        duplicates = _find_duplicates([task.name for group in data for task in group.tasks])
         if duplicates:
             raise ValueError(f"Task names should be unique, duplicates: {duplicates}")
         return data
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import functools
+import os
+import sys
 import warnings
 from collections.abc import Generator
 from dataclasses import dataclass
@@ -48,8 +51,14 @@ class Course:
         self.repository_root = repository_root
         self.reference_root = reference_root or repository_root
 
-        self.potential_groups = {group.name: group for group in self._search_for_groups_by_configs(self.reference_root)}
-        self.potential_tasks = {task.name: task for task in self._search_for_tasks_by_configs(self.reference_root)}
+    @functools.cached_property
+    def potential_groups(self) -> dict[str, FileSystemGroup]:
+        # searched on first access, so BadConfig for tasks/groups configs is raised lazily
+        return {group.name: group for group in self._search_for_groups_by_configs(self.reference_root)}
+
+    @functools.cached_property
+    def potential_tasks(self) -> dict[str, FileSystemTask]:
+        return {task.name: task for task in self._search_for_tasks_by_configs(self.reference_root)}
 
     def validate(self) -> None:
         # check all groups and tasks mentioned in deadlines exists
@@ -87,11 +96,32 @@ class Course:
             if deadline_task.name in self.potential_tasks
         ]
 
+    @staticmethod
+    def _search_for_config_files(
+        root: Path | str,
+        config_name: str,
+    ) -> Generator[Path, Any, None]:
+        # os.scandir reuses file types from directory listing, no extra stat and Path per entry
+        sub_folders = []
+        try:
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        sub_folders.append(entry.path)
+                    elif entry.name == config_name and entry.is_file():
+                        yield Path(entry.path)
+        except (FileNotFoundError, PermissionError):
+            # skip missing or unreadable folders, same as Path.glob
+            return
+
+        for sub_folder in sub_folders:
+            yield from Course._search_for_config_files(sub_folder, config_name)
+
     @staticmethod
     def _search_for_tasks_by_configs(
         root: Path,
     ) -> Generator[FileSystemTask, Any, None]:
-        for task_config_path in root.glob(f"**/{Course.TASK_CONFIG_NAME}"):
+        for task_config_path in Course._search_for_config_files(root, Course.TASK_CONFIG_NAME):
             relative_task_path = task_config_path.parent.relative_to(root)
 
             # if empty file - use default
@@ -102,7 +132,7 @@ class Course:
                 task_config = CheckerSubConfig.from_yaml(task_config_path)
 
             yield FileSystemTask(
-                name=task_config_path.parent.name,
+                name=sys.intern(task_config_path.parent.name),
                 relative_path=str(relative_task_path),
                 config=task_config,
             )
@@ -111,7 +141,7 @@ class Course:
     def _search_for_groups_by_configs(
         root: Path,
     ) -> Generator[FileSystemGroup, Any, None]:
-        for group_config_path in root.glob(f"**/{Course.GROUP_CONFIG_NAME}"):
+        for group_config_path in Course._search_for_config_files(root, Course.GROUP_CONFIG_NAME):
             relative_group_path = group_config_path.parent.relative_to(root)
 
             # if empty file - use default
@@ -126,7 +156,7 @@ class Course:
                 task.relative_path = str(relative_group_path / task.relative_path)
 
             yield FileSystemGroup(
-                name=group_config_path.parent.name,
+                name=sys.intern(group_config_path.parent.name),
                 relative_path=str(relative_group_path),
                 config=group_config,
                 tasks=group_tasks,
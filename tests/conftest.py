@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import contextlib
+import os
 from collections.abc import Callable
 from pathlib import Path
 from typing import Any, Optional
@@ -8,6 +10,97 @@ import pytest
 
 
 T_GENERATE_FILE_STRUCTURE = Callable[[dict[str, Any], Optional[Path]], Path]
+T_FLAT_FILE_STRUCTURE = tuple[tuple[str, ...], tuple[tuple[str, bytes], ...]]
+
+
+def flatten_file_structure(files_content: dict[str, Any], prefix: str = "") -> T_FLAT_FILE_STRUCTURE:
+    """
+    Flatten nested file structure to relative folders and (relative file, content) pairs.
+    Folders are sorted by depth, so every folder comes after its parent.
+
+    :param files_content: dictionary with file names as keys and file content as values
+    :param prefix: relative path of the files_content folder
+    :return: tuple of folders and tuple of files with content
+    """
+    dirs: list[str] = []
+    files: list[tuple[str, bytes]] = []
+
+    for filename, content in files_content.items():
+        relative_path = prefix + filename
+
+        if isinstance(content, dict):
+            sub_dirs, sub_files = flatten_file_structure(content, prefix=relative_path + "/")
+            dirs.append(relative_path)
+            dirs.extend(sub_dirs)
+            files.extend(sub_files)
+        elif isinstance(content, str):
+            files.append((relative_path, content.encode()))
+        else:
+            raise ValueError(f"Unknown type of file content: {type(content)}")
+
+    return tuple(sorted(dirs, key=lambda relative_dir: relative_dir.count("/"))), tuple(files)
+
+
+def write_flat_file_structure(root: Path, dirs: tuple[str, ...], files: tuple[tuple[str, bytes], ...]) -> Path:
+    """
+    Write flattened file structure to the given folder.
+
+    :param root: root folder to generate file in
+    :param dirs: relative folders to create, parents first
+    :param files: relative files to create with their content
+    :return: path to root folder
+    """
+    prefix = str(root) + "/"
+
+    os.makedirs(prefix, exist_ok=True)
+    # dirs are sorted by depth, so a single mkdir per folder is enough
+    for relative_dir in dirs:
+        with contextlib.suppress(FileExistsError):
+            os.mkdir(prefix + relative_dir)
+
+    for relative_file, content in files:
+        fd = os.open(prefix + relative_file, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o644)
+        try:
+            if content:
+                os.write(fd, content)
+        finally:
+            os.close(fd)
+
+    return root
+
+
+def prune_flat_file_structure(
+    root: Path, dirs: tuple[str, ...], files: tuple[tuple[str, bytes], ...], subpath: str
+) -> None:
+    """
+    Remove subfolder of the written flattened file structure without walking the file system.
+
+    :param root: root folder the structure was written to
+    :param dirs: relative folders of the structure, parents first
+    :param files: relative files of the structure with their content
+    :param subpath: relative folder to remove
+    """
+    prefix = str(root) + "/"
+    subpath_prefix = subpath + "/"
+
+    for relative_file, _ in files:
+        if relative_file.startswith(subpath_prefix):
+            os.unlink(prefix + relative_file)
+    for relative_dir in reversed(dirs):
+        if relative_dir.startswith(subpath_prefix):
+            os.rmdir(prefix + relative_dir)
+    os.rmdir(prefix + subpath)
+
+
+def write_file_structure(files_content: dict[str, Any], root: Path) -> Path:
+    """
+    Write file structure to the given folder.
+
+    :param files_content: dictionary with file names as keys and file content as values
+    :param root: root folder to generate file in
+    :return: path to root folder
+    """
+    return write_flat_file_structure(root, *flatten_file_structure(files_content))
 
 
 @pytest.fixture
@@ -26,25 +119,12 @@ def generate_file_structure(
     def _generate_file_structure(files_content: dict[str, Any], root: Path = tmpdir) -> Path:
         """
         Generate file structure in temporary folder.
-        Recursively iterate over files_content and create files and folders.
 
         :param files_content: dictionary with file names as keys and file content as values
         :param root: root folder to generate file in
         :return: path to temporary folder
         """
-        root.mkdir(parents=True, exist_ok=True)
-
-        for filename, content in files_content.items():
-            file = Path(root / filename)
-
-            if isinstance(content, dict):
-                _generate_file_structure(content, root=file)
-            elif isinstance(content, str):
-                with open(file, "w") as f:
-                    f.write(content)
-            else:
-                raise ValueError(f"Unknown type of file content: {type(content)}")
-
+        write_file_structure(files_content, root)
         return tmpdir
 
     return _generate_file_structure
@@ -73,6 +153,13 @@ def pytest_addoption(parser: pytest.Parser) -> None:
         default=False,
         help="skip unit tests",
     )
+    parser.addoption(
+        "--batched",
+        action="store_true",
+        dest="batched",
+        default=False,
+        help="run batched tests instead of their per-case counterparts",
+    )
     parser.addoption(
         "--skip-doctest",
         action="store_true",
@@ -84,6 +171,8 @@ def pytest_addoption(parser: pytest.Parser) -> None:
 
 def pytest_configure(config: pytest.Config) -> None:
     config.addinivalue_line("markers", "integration: mark test as integration test")
+    config.addinivalue_line("markers", "batched: run all cases in a single test, enabled with --batched")
+    config.addinivalue_line("markers", "batchable: per-case test with a batched counterpart, skipped with --batched")
 
     # Add --doctest-modules by default if --skip-doctest is not set
     if not config.getoption("--skip-doctest"):
@@ -99,8 +188,15 @@ def pytest_collection_modifyitems(
     skip_integration = pytest.mark.skip(reason="--skip-integration option was provided")
     skip_unit = pytest.mark.skip(reason="--skip-unit option was provided")
     skip_doctest = pytest.mark.skip(reason="--skip-doctest option was provided")
+    skip_batched = pytest.mark.skip(reason="--batched option was not provided")
+    skip_batchable = pytest.mark.skip(reason="--batched option was provided")
 
     for item in items:
+        if "batched" in item.keywords and not config.getoption("--batched"):
+            item.add_marker(skip_batched)
+        if "batchable" in item.keywords and config.getoption("--batched"):
+            item.add_marker(skip_batchable)
+
         if isinstance(item, pytest.DoctestItem):
             item.add_marker(skip_doctest)
         elif "firejail" in item.keywords:
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import copy
+import os
 import shutil
+import subprocess
 from pathlib import Path
 
-import git
 import pytest
 
 from checker.configs import CheckerTestingConfig
@@ -11,7 +13,7 @@ from checker.configs.deadlines import DeadlinesConfig
 from checker.course import Course, FileSystemGroup, FileSystemTask
 from checker.exceptions import BadConfig, CheckerException
 
-from .conftest import T_GENERATE_FILE_STRUCTURE
+from .conftest import flatten_file_structure, prune_flat_file_structure, write_flat_file_structure
 
 
 TEST_TIMEZONE = "Europe/Berlin"
@@ -39,7 +41,8 @@ TEST_FILE_STRUCTURE = {
     "root_task_1": {".task.yml": "version: 1", "file1": "", "file2": ""},
     "extra_file1": "",
 }
-TEST_DEADLINES_CONFIG = DeadlinesConfig(
+TEST_DIRS, TEST_FILES = flatten_file_structure(TEST_FILE_STRUCTURE)
+TEST_DEADLINES_CONFIG_DATA = dict(
     version=1,
     settings={"timezone": TEST_TIMEZONE},
     schedule=[
@@ -83,40 +86,156 @@ TEST_DEADLINES_CONFIG = DeadlinesConfig(
     ],
 )
 
+_BRANCH_CASES: tuple[tuple[str, tuple[str, ...], frozenset[str]], ...] = (
+    ("task1_1", ("group1/task1_1/file1_1_1",), frozenset({"task1_1"})),
+    ("task1_1", ("group1/task1_1/file1_1_1", "random_file.txt", "group1/task1_1/file1_1_1"), frozenset({"task1_1"})),
+    ("task2_1", ("group2/task2_1/file1_1_1",), frozenset()),  # not enabled
+    ("not_a_task", ("group2/task2_1/file2_1_1",), frozenset()),
+    ("root_task_1", ("root_task_1/file1",), frozenset({"root_task_1"})),
+    ("root_task_1", (), frozenset({"root_task_1"})),
+)
 
-@pytest.fixture()
-def repository_root(generate_file_structure: T_GENERATE_FILE_STRUCTURE) -> Path:
-    return generate_file_structure(TEST_FILE_STRUCTURE)
+_COMMIT_MESSAGE_CASES: tuple[tuple[str, tuple[str, ...], frozenset[str]], ...] = (
+    ("task1_1", ("group1/task1_1/file1_1_1",), frozenset({"task1_1"})),
+    ("fixses in task1_1", ("group1/task1_1/file1_1_1",), frozenset({"task1_1"})),
+    (
+        "task1_1 some commit",
+        ("group1/task1_1/file1_1_1", "random_file.txt", "group1/task1_1/file1_1_1"),
+        frozenset({"task1_1"}),
+    ),
+    ("add fixes for task2_1", ("group2/task2_1/file1_1_1",), frozenset()),  # not enabled
+    ("    not_a_task", ("group2/task2_1/file2_1_1",), frozenset()),
+    ("root_task_1", ("root_task_1/file1",), frozenset({"root_task_1"})),
+    ("my root_task_1 is really cool", (), frozenset({"root_task_1"})),
+    (
+        "my root_task_1 and task1_1 and not enabled task2_1",
+        ("group2/task2_1/file2_1_1",),
+        frozenset({"root_task_1", "task1_1"}),
+    ),
+    ("commit root_task_1", (), frozenset({"root_task_1"})),
+    ("commit root_task_1 and some more", (), frozenset({"root_task_1"})),
+)
+
+_LAST_COMMIT_CASES: tuple[tuple[tuple[str, ...], frozenset[str]], ...] = (
+    (("group1/task1_1/file.txt",), frozenset({"task1_1"})),
+    (("group1/task1_1/file.txt", "random_file.txt", "group1/task1_1/file.txt"), frozenset({"task1_1"})),
+    (("group2/task2_1/file.txt",), frozenset()),  # not enabled
+    (("group2/task2_1/file2_1_1.txt",), frozenset()),  # not enabled
+    (("some_root_file", "random_folder/random_file.txt"), frozenset()),
+    (
+        ("group2/task2_1/file2_1_1.txt", "group1/task1_1/file.txt", "root_task_1/some.txt"),
+        frozenset({"task1_1", "root_task_1"}),
+    ),
+    (("root_task_1/file1.txt",), frozenset({"root_task_1"})),
+    ((), frozenset()),
+)
+
+
+def _git(path: Path, *argv: str) -> None:
+    # user is passed on every call, so repositories need no local config
+    subprocess.run(
+        ["git", "-C", os.fspath(path), "-c", "user.name=test_user", "-c", "user.email=not@val.id", *argv],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def _write_changed(root_s: str, changed_files: tuple[str, ...]) -> None:
+    for filename in changed_files:
+        fd = os.open(root_s + filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, f"random_text_to_write_in_file {filename}".encode())
+        finally:
+            os.close(fd)
+
+
+def _commit_changes(root: Path, changed_files: tuple[str, ...], message: str) -> None:
+    # create or change files
+    _write_changed(os.fspath(root) + "/", changed_files)
+    # stage only changed files, no worktree scan (allow empty commit)
+    if changed_files:
+        _git(root, "update-index", "--add", "--", *changed_files)
+    _git(root, "commit", "-m", message, "--allow-empty")
+
+
+def _xdist_worker_id() -> str:
+    # session templates are built once per pytest-xdist worker, keep their folders apart
+    return os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+
+
+@pytest.fixture(scope="session")
+def deadlines_config() -> DeadlinesConfig:
+    return DeadlinesConfig(**TEST_DEADLINES_CONFIG_DATA)
 
 
 @pytest.fixture()
-def git_init_repository_root(repository_root: Path) -> Path:
+def repository_root(tmp_path: Path) -> Path:
+    return write_flat_file_structure(tmp_path, TEST_DIRS, TEST_FILES)
+
+
+@pytest.fixture(scope="session")
+def _course_template(
+    tmp_path_factory: pytest.TempPathFactory, deadlines_config: DeadlinesConfig
+) -> tuple[Path, Course]:
+    template_root = write_flat_file_structure(
+        tmp_path_factory.mktemp(f"course_template-{_xdist_worker_id()}"), TEST_DIRS, TEST_FILES
+    )
+    template_course = Course(deadlines=deadlines_config, repository_root=template_root)
+    # search eagerly, so copies in git_course share the cached results whatever the test order
+    assert template_course.potential_groups and template_course.potential_tasks
+    return template_root, template_course
+
+
+@pytest.fixture(scope="session")
+def _git_repo_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    template_root = write_flat_file_structure(
+        tmp_path_factory.mktemp(f"git_template-{_xdist_worker_id()}"), TEST_DIRS, TEST_FILES
+    )
     # init git repo
-    repo = git.Repo.init(repository_root)
-    # setup local config
-    repo.config_writer().set_value("user", "name", "test_user").release()
-    repo.config_writer().set_value("user", "email", "not@val.id").release()
+    _git(template_root, "init", "--template=", "--quiet")
     # commit changes
-    repo.git.add(".")
-    repo.git.commit("-m", "initial commit")
-    return repository_root
+    _git(template_root, "add", ".")
+    _git(template_root, "commit", "-m", "initial commit")
+    return template_root
+
+
+@pytest.fixture()
+def git_init_repository_root(_git_repo_template: Path, tmp_path: Path) -> Path:
+    # copy pristine repo instead of re-creating it for every test
+    shutil.copytree(_git_repo_template, tmp_path, dirs_exist_ok=True)
+    return tmp_path
+
+
+@pytest.fixture()
+def git_course(_course_template: tuple[Path, Course], git_init_repository_root: Path) -> Course:
+    # tasks are read from the template (reference_root) and changes detected in the git copy (repository_root);
+    # both trees are written from TEST_DIRS and TEST_FILES, so tasks relative paths are the same in both
+    template_root, template_course = _course_template
+    test_course = copy.copy(template_course)
+    test_course.repository_root = git_init_repository_root
+    test_course.reference_root = template_root
+    assert all(
+        (git_init_repository_root / task.relative_path).is_dir() for task in test_course.potential_tasks.values()
+    )
+    return test_course
 
 
 class TestCourse:
-    def test_init(self, repository_root: Path) -> None:
-        test_course = Course(deadlines=TEST_DEADLINES_CONFIG, repository_root=repository_root)
-        assert test_course.repository_root == repository_root
-        assert test_course.deadlines == TEST_DEADLINES_CONFIG
+    def test_init(self, _course_template: tuple[Path, Course], deadlines_config: DeadlinesConfig) -> None:
+        template_root, test_course = _course_template
+        assert test_course.repository_root == template_root
+        assert test_course.deadlines == deadlines_config
 
-    def test_validate(self, repository_root: Path) -> None:
-        test_course = Course(deadlines=TEST_DEADLINES_CONFIG, repository_root=repository_root)
+    def test_validate(self, _course_template: tuple[Path, Course]) -> None:
+        _, test_course = _course_template
 
         try:
             test_course.validate()
         except Exception as e:
             pytest.fail(f"Validation failed: {e}")
 
-    def test_search_for_groups_by_configs(self, repository_root: Path) -> None:
+    def test_search_for_groups_by_configs(self, _course_template: tuple[Path, Course]) -> None:
+        repository_root, _ = _course_template
         potential_groups = list(Course._search_for_groups_by_configs(repository_root))
         assert len(potential_groups) == 4
         assert sum(len(group.tasks) for group in potential_groups) == 6
@@ -124,29 +243,34 @@ class TestCourse:
             assert isinstance(group, FileSystemGroup)
             assert (repository_root / group.relative_path).exists()
 
-    def test_search_for_tasks_by_configs(self, repository_root: Path) -> None:
+    def test_search_for_tasks_by_configs(self, _course_template: tuple[Path, Course]) -> None:
+        repository_root, _ = _course_template
         tasks = list(Course._search_for_tasks_by_configs(repository_root))
         assert len(tasks) == 7
         for task in tasks:
             assert isinstance(task, FileSystemTask)
             assert (repository_root / task.relative_path).exists()
 
-    def test_validate_missing_task(self, repository_root: Path) -> None:
-        shutil.rmtree(repository_root / "group1" / "task1_1")
+    def test_search_for_tasks_by_configs_missing_root(self, tmp_path: Path) -> None:
+        assert list(Course._search_for_tasks_by_configs(tmp_path / "missing")) == []
+        assert list(Course._search_for_groups_by_configs(tmp_path / "missing")) == []
+
+    def test_validate_missing_task(self, repository_root: Path, deadlines_config: DeadlinesConfig) -> None:
+        prune_flat_file_structure(repository_root, TEST_DIRS, TEST_FILES, "group1/task1_1")
         with pytest.raises(BadConfig):
-            Course(deadlines=TEST_DEADLINES_CONFIG, repository_root=repository_root).validate()
+            Course(deadlines=deadlines_config, repository_root=repository_root).validate()
 
-    def test_validate_missing_group(self, repository_root: Path) -> None:
-        shutil.rmtree(repository_root / "group3")
+    def test_validate_missing_group(self, repository_root: Path, deadlines_config: DeadlinesConfig) -> None:
+        prune_flat_file_structure(repository_root, TEST_DIRS, TEST_FILES, "group3")
         with pytest.warns():
-            Course(deadlines=TEST_DEADLINES_CONFIG, repository_root=repository_root).validate()
+            Course(deadlines=deadlines_config, repository_root=repository_root).validate()
 
-    def test_init_task_bad_config(self, repository_root: Path) -> None:
+    def test_init_task_bad_config(self, repository_root: Path, deadlines_config: DeadlinesConfig) -> None:
         with open(repository_root / "group1" / "task1_1" / Course.TASK_CONFIG_NAME, "w") as f:
             f.write("bad_config")
 
         with pytest.raises(BadConfig):
-            Course(deadlines=TEST_DEADLINES_CONFIG, repository_root=repository_root)
+            Course(deadlines=deadlines_config, repository_root=repository_root).validate()
 
     @pytest.mark.parametrize(
         "enabled, expected_num_groups",
@@ -156,8 +280,8 @@ class TestCourse:
             (False, 1),
         ],
     )
-    def test_get_groups(self, enabled: bool | None, expected_num_groups, repository_root: Path) -> None:
-        test_course = Course(deadlines=TEST_DEADLINES_CONFIG, repository_root=repository_root)
+    def test_get_groups(self, enabled: bool | None, expected_num_groups, _course_template: tuple[Path, Course]) -> None:
+        _, test_course = _course_template
 
         groups = test_course.get_groups(enabled=enabled)
         assert isinstance(groups, list)
@@ -172,132 +296,96 @@ class TestCourse:
             (False, 3),
         ],
     )
-    def test_get_tasks(self, enabled: bool | None, expected_num_tasks, repository_root: Path) -> None:
-        test_course = Course(deadlines=TEST_DEADLINES_CONFIG, repository_root=repository_root)
+    def test_get_tasks(self, enabled: bool | None, expected_num_tasks, _course_template: tuple[Path, Course]) -> None:
+        _, test_course = _course_template
 
         tasks = test_course.get_tasks(enabled=enabled)
         assert isinstance(tasks, list)
         assert all(isinstance(task, FileSystemTask) for task in tasks)
         assert len(tasks) == expected_num_tasks
 
-    def test_detect_changes_not_a_repo(self, repository_root: Path) -> None:
-        test_course = Course(deadlines=TEST_DEADLINES_CONFIG, repository_root=repository_root)
+    def test_detect_changes_not_a_repo(self, repository_root: Path, deadlines_config: DeadlinesConfig) -> None:
+        test_course = Course(deadlines=deadlines_config, repository_root=repository_root)
         with pytest.raises(CheckerException):
             test_course.detect_changes(CheckerTestingConfig.ChangesDetectionType.COMMIT_MESSAGE)
 
     @pytest.mark.parametrize(
         "branch_name, changed_files, expected_changed_tasks",
-        [
-            ("task1_1", ["group1/task1_1/file1_1_1"], ["task1_1"]),
-            ("task1_1", ["group1/task1_1/file1_1_1", "random_file.txt", "group1/task1_1/file1_1_1"], ["task1_1"]),
-            ("task2_1", ["group2/task2_1/file1_1_1"], []),  # not enabled
-            ("not_a_task", ["group2/task2_1/file2_1_1"], []),
-            ("root_task_1", ["root_task_1/file1"], ["root_task_1"]),
-            ("root_task_1", [], ["root_task_1"]),
-        ],
+        _BRANCH_CASES,
     )
     def test_detect_changes_by_branch_name(
         self,
         git_init_repository_root: Path,
+        git_course: Course,
         branch_name: str,
-        changed_files: list[str],
-        expected_changed_tasks: list[str],
+        changed_files: tuple[str, ...],
+        expected_changed_tasks: frozenset[str],
     ) -> None:
-        test_course = Course(deadlines=TEST_DEADLINES_CONFIG, repository_root=git_init_repository_root)
-        repo = git.Repo(git_init_repository_root)
-
         # create new branch
-        repo.git.checkout("-b", branch_name)
-        # create or change files
-        for filename in changed_files:
-            Path(git_init_repository_root / filename).write_text(f"random_text_to_write_in_file {filename}")
-        # commit changes (allow empty commit)
-        repo.git.add(".")
-        repo.git.commit("-m", "random commit message", "--allow-empty")
-
-        changed_tasks = test_course.detect_changes(CheckerTestingConfig.ChangesDetectionType.BRANCH_NAME)
+        _git(git_init_repository_root, "checkout", "-b", branch_name)
+        _commit_changes(git_init_repository_root, changed_files, "random commit message")
+
+        changed_tasks = git_course.detect_changes(CheckerTestingConfig.ChangesDetectionType.BRANCH_NAME)
         assert isinstance(changed_tasks, list)
         assert all(isinstance(task, FileSystemTask) for task in changed_tasks)
         assert len(changed_tasks) == len(expected_changed_tasks)
-        assert sorted(task.name for task in changed_tasks) == sorted(expected_changed_tasks)
+        assert frozenset(task.name for task in changed_tasks) == expected_changed_tasks
 
+    @pytest.mark.batchable
     @pytest.mark.parametrize(
         "commit_message, changed_files, expected_changed_tasks",
-        [
-            ("task1_1", ["group1/task1_1/file1_1_1"], ["task1_1"]),
-            ("fixses in task1_1", ["group1/task1_1/file1_1_1"], ["task1_1"]),
-            (
-                "task1_1 some commit",
-                ["group1/task1_1/file1_1_1", "random_file.txt", "group1/task1_1/file1_1_1"],
-                ["task1_1"],
-            ),
-            ("add fixes for task2_1", ["group2/task2_1/file1_1_1"], []),  # not enabled
-            ("    not_a_task", ["group2/task2_1/file2_1_1"], []),
-            ("root_task_1", ["root_task_1/file1"], ["root_task_1"]),
-            ("my root_task_1 is really cool", [], ["root_task_1"]),
-            (
-                "my root_task_1 and task1_1 and not enabled task2_1",
-                ["group2/task2_1/file2_1_1"],
-                ["root_task_1", "task1_1"],
-            ),
-            ("commit root_task_1", [], ["root_task_1"]),
-            ("commit root_task_1 and some more", [], ["root_task_1"]),
-        ],
+        _COMMIT_MESSAGE_CASES,
     )
     def test_detect_changes_by_commit_message(
         self,
         git_init_repository_root: Path,
+        git_course: Course,
         commit_message: str,
-        changed_files: list[str],
-        expected_changed_tasks: list[str],
+        changed_files: tuple[str, ...],
+        expected_changed_tasks: frozenset[str],
     ) -> None:
-        test_course = Course(deadlines=TEST_DEADLINES_CONFIG, repository_root=git_init_repository_root)
-        repo = git.Repo(git_init_repository_root)
+        _commit_changes(git_init_repository_root, changed_files, commit_message)
 
-        # create or change files
-        for filename in changed_files:
-            Path(git_init_repository_root / filename).write_text(f"random_text_to_write_in_file {filename}")
-        # commit changes (allow empty commit)
-        repo.git.add(".")
-        repo.git.commit("-m", commit_message, "--allow-empty")
-
-        changed_tasks = test_course.detect_changes(CheckerTestingConfig.ChangesDetectionType.COMMIT_MESSAGE)
+        changed_tasks = git_course.detect_changes(CheckerTestingConfig.ChangesDetectionType.COMMIT_MESSAGE)
         assert isinstance(changed_tasks, list)
         assert all(isinstance(task, FileSystemTask) for task in changed_tasks)
         assert len(changed_tasks) == len(expected_changed_tasks)
-        assert sorted(task.name for task in changed_tasks) == sorted(expected_changed_tasks)
+        assert frozenset(task.name for task in changed_tasks) == expected_changed_tasks
+
+    @pytest.mark.batched
+    def test_detect_changes_by_commit_message_batched(
+        self,
+        git_init_repository_root: Path,
+        git_course: Course,
+    ) -> None:
+        # same cases as test_detect_changes_by_commit_message, sharing a single repository
+        for commit_message, changed_files, expected_changed_tasks in _COMMIT_MESSAGE_CASES:
+            _commit_changes(git_init_repository_root, changed_files, commit_message)
+
+            changed_tasks = git_course.detect_changes(CheckerTestingConfig.ChangesDetectionType.COMMIT_MESSAGE)
+            assert isinstance(changed_tasks, list), commit_message
+            assert all(isinstance(task, FileSystemTask) for task in changed_tasks), commit_message
+            assert len(changed_tasks) == len(expected_changed_tasks), commit_message
+            assert frozenset(task.name for task in changed_tasks) == expected_changed_tasks, commit_message
+
+            # drop the case commit, so the next case starts from the initial commit
+            _git(git_init_repository_root, "reset", "--hard", "HEAD~1")
 
     @pytest.mark.parametrize(
         "changed_files, expected_changed_tasks",
-        [
-            (["group1/task1_1/file.txt"], ["task1_1"]),
-            (["group1/task1_1/file.txt", "random_file.txt", "group1/task1_1/file.txt"], ["task1_1"]),
-            (["group2/task2_1/file.txt"], []),  # not enabled
-            (["group2/task2_1/file2_1_1.txt"], []),  # not enabled
-            (["some_root_file", "random_folder/random_file.txt"], []),
-            (
-                ["group2/task2_1/file2_1_1.txt", "group1/task1_1/file.txt", "root_task_1/some.txt"],
-                ["task1_1", "root_task_1"],
-            ),
-            (["root_task_1/file1.txt"], ["root_task_1"]),
-            ([], []),
-        ],
+        _LAST_COMMIT_CASES,
     )
     def test_detect_changes_by_last_commit_changes(
-        self, git_init_repository_root: Path, changed_files: list[str], expected_changed_tasks: list[str]
+        self,
+        git_init_repository_root: Path,
+        git_course: Course,
+        changed_files: tuple[str, ...],
+        expected_changed_tasks: frozenset[str],
     ) -> None:
-        test_course = Course(deadlines=TEST_DEADLINES_CONFIG, repository_root=git_init_repository_root)
-        repo = git.Repo(git_init_repository_root)
-
-        # create or change files
-        for filename in changed_files:
-            Path(git_init_repository_root / filename).write_text(f"random_text_to_write_in_file {filename}")
-        # commit changes (allow empty commit)
-        repo.git.add(".")
-        repo.git.commit("-m", "random commit message", "--allow-empty")
+        _commit_changes(git_init_repository_root, changed_files, "random commit message")
 
-        changed_tasks = test_course.detect_changes(CheckerTestingConfig.ChangesDetectionType.LAST_COMMIT_CHANGES)
+        changed_tasks = git_course.detect_changes(CheckerTestingConfig.ChangesDetectionType.LAST_COMMIT_CHANGES)
         assert isinstance(changed_tasks, list)
         assert all(isinstance(task, FileSystemTask) for task in changed_tasks)
         assert len(changed_tasks) == len(expected_changed_tasks)
-        assert sorted(task.name for task in changed_tasks) == sorted(expected_changed_tasks)
+        assert frozenset(task.name for task in changed_tasks) == expected_changed_tasks